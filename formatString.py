@@ -2,11 +2,7 @@ def removeNonAscii(text):
     """
     Keeps only the first 256 characters of extended ASCII. Probably bad for portability
     """
-    newString = ""
-    for char in text:
-        if ord(char) <= 255:
-            newString = newString + char
-    return newString
+    return "".join([char for char in text if ord(char) <= 255])
 
 
 def placeString(string, length, start=0):
@@ -32,7 +28,7 @@ def spacesString(spaces):
     """
     Returns a string of spaces, with length equal to spaces parameter
     """
-    return "".zfill(spaces).replace("0", " ")
+    return " " * spaces
 
 
 def tabulate(string, terminalWidth=80, spaces=8):
@@ -44,65 +40,47 @@ def tabulate(string, terminalWidth=80, spaces=8):
     # Removes tabs from the original string
     string = string.replace("\t", "")
 
-    # Splits the string into a list, separating at newlines already present (ends of paragraphs)
-    stringList = string.splitlines()
-
     offset = terminalWidth - spaces  # the number of non-space characters for the line
-    tempstr = ""  # Stores the working string while it is being built up
-    checkstr = ""  # Used for checking if adding the next word will push the string over the length limit
+    indent = spacesString(spaces)  # Built once, as every line starts with it
+    line = ""  # Stores the working line while it is being built up
     tabulatedList = []  # A list comprised of each finished line
-    for item in stringList:
-        item = (
-            item.split()
-        )  # Splits the paragraphs up by words. Separating at every space
-        for word in item:  # Loops through every word
+    append = tabulatedList.append
+
+    # Splits the string at newlines already present (ends of paragraphs)
+    for item in string.splitlines():
+        for word in item.split():  # Splits the paragraphs up by words. Separating at every space
             # If the word is longer than the amount of space for a single line
             if len(word) > offset:
                 # Finishes the work in progress line
-                tabulatedList.append(f"{spacesString(spaces)}{checkstr}\n")
-                tempstr = ""
-                checkstr = ""
-
-                # Used to split the long word (typically links) into multiple lines
-                workingWord = word
+                append(f"{indent}{line}\n")
+                line = ""
 
-                # Splits word into offset sized lines
-                while len(workingWord) > offset:
-                    tabulatedList.append(
-                        f"{spacesString(spaces)}{workingWord[:offset]}\n"
-                    )
-                    workingWord = workingWord[offset:]
+                # Splits the long word (typically links) into offset sized lines
+                start = 0
+                while len(word) - start > offset:
+                    append(f"{indent}{word[start : start + offset]}\n")
+                    start += offset
 
                 # Gives the end of the word (the part less than offset length) its own line
-                tabulatedList.append(f"{spacesString(spaces)}{workingWord}\n")
+                append(f"{indent}{word[start:]}\n")
                 continue
 
-            # For normal words
-            checkstr = checkstr + word
-            if (
-                len(checkstr) < offset
-            ):  # simply adds new word to tempstr if it won't make it too long
-                tempstr = checkstr
-                tempstr = tempstr + " "
-                checkstr = tempstr
-            elif (
-                len(checkstr) == offset
-            ):  # Adds word, then pushes line to list and starts new line
-                tabulatedList.append(f"{spacesString(spaces)}{checkstr}\n")
-                tempstr = ""
-                checkstr = ""
+            # For normal words. Used for checking if adding the word will push the line over the length limit
+            checkstr = line + word
+            if len(checkstr) < offset:  # simply adds new word to the line if it won't make it too long
+                line = checkstr + " "
+            elif len(checkstr) == offset:  # Adds word, then pushes line to list and starts new line
+                append(f"{indent}{checkstr}\n")
+                line = ""
             else:  # Pushes current line to list, then starts a new line with word at the start
-                tabulatedList.append(f"{spacesString(spaces)}{tempstr}\n")
-                tempstr = word + " "
-                checkstr = tempstr
+                append(f"{indent}{line}\n")
+                line = word + " "
 
         # Adds leftover words at the end of paragraph
-        tabulatedList.append(f"{spacesString(spaces)}{tempstr}\n")
-        tempstr = ""
-        checkstr = ""
+        append(f"{indent}{line}\n")
+        line = ""
 
-    newStr = ""
-    return newStr.join(tabulatedList)  # Combines list into a single string
+    return "".join(tabulatedList)  # Combines list into a single string
 
 
 def enbox(
@@ -20,6 +20,15 @@ from .tree import Tree
 
 
 class Node(Tree):
+    __slots__ = (
+        "data",
+        "print_function",
+        "print_args",
+        "_str_cache",
+        "_str_name",
+        "_str_dirty",
+    )
+
     def __init__(
         self, data=None, name=None, print_function=None, print_args=None, nodes=None
     ):
@@ -31,14 +40,38 @@ class Node(Tree):
         nodes is the child nodes of this node.
         """
         super().__init__(name=name, nodes=nodes)
-        self.name = name
-        self.data = data
-        self.print_function = print_function
-        self.print_args = print_args
+        self.data, self.print_function, self.print_args = data, print_function, print_args
+        self._str_cache = None
+        self._str_name = None
+        self._str_dirty = True
+
+    def invalidate_str(self):
+        """
+        Clears the cached string of the node, so print_function is called again the next time it is printed.
+        Needs to be called after changing data, print_function or print_args. Changing the name with set_name
+        is picked up without it.
+        """
+        self._str_dirty = True
+        self._mark_dirty()
 
     def __str__(self):
         """
-        Calls and returns the results of self.print_function if it exists, otherwise returns the name
+        Calls and returns the results of self.print_function if it exists, otherwise returns the name.
+        The result is cached until invalidate_str is called, or the name is changed when the string is the name.
+        """
+        # The name is only checked when neither print_function nor data decides the string, so changing
+        # it doesn't call print_function again.
+        if self._str_dirty or (
+            self._str_name is not self.name and not self.print_function and self.data is None
+        ):
+            self._str_cache = self.__make_str()
+            self._str_name = self.name
+            self._str_dirty = False
+        return self._str_cache
+
+    def __make_str(self):
+        """
+        Builds the string returned by __str__. Should not be called from outside of the class.
         """
         if self.print_function:
             if self.print_args:
@@ -22,10 +22,83 @@
 #
 #^~~^~~^~~^~~^~~^~~^~~^~~^~~^~~^~~^~~^~~^~~^~~^~~^~~^~~^~~^~~^~~^~~^~~^~~^~~^~~^~
 
+from collections import namedtuple
+from itertools import count
+
 from .formatString import tabulate
 
+# Source of revision numbers for trees. Every change to any tree takes the next number, so a tree's
+# output only needs to be regenerated when something below it has a newer revision than its cache.
+_revisions = count(1)
+# The newest revision taken, so that it can be told when no tree at all has changed since a given revision
+_latest_revision = 0
+
+# The characters used to draw a tree. There are only two sets of them, which are shared by every tree.
+# The lengths of the branch characters are stored alongside them, as they are needed for every tree printed.
+_CharSet = namedtuple(
+    "_CharSet",
+    ("pipe", "branch", "end", "space", "nameless", "split_line", "branch_len", "end_len"),
+)
+
+
+def _char_set(pipe, branch, end, space, nameless, split_line):
+    """Makes a _CharSet from its characters, measuring the branch characters."""
+    return _CharSet(pipe, branch, end, space, nameless, split_line, len(branch), len(end))
+
+
+_FANCY = _char_set(pipe="│", branch="├─", end="└─", space=" ", nameless="┐", split_line="~")
+_ASCII = _char_set(pipe="|", branch="|->", end="|->", space="  ", nameless="\\", split_line="~")
+
+# A tree on the stack of Tree.__generate_lines whose children are still being generated, with the settings
+# and prefixes shared by their lines. Built by Tree.__frame_state, see there for what the fields hold.
+_FrameState = namedtuple(
+    "_FrameState",
+    (
+        "children",
+        "last_idx",
+        "tree_chars",
+        "end_wrap",
+        "branch_wrap",
+        "child_prior_prefix",
+        "lead",
+        "first_split",
+        "branch_prefix",
+        "end_prefix",
+        "pipe_split",
+        "space_split",
+    ),
+)
+# A line still to be reprefixed by Tree.__generate_lines: the first line below a tree whose name wrapped
+# to no lines at all. See Tree.__settle_blank_name for what the fields hold.
+_Pending = namedtuple("_Pending", ("index", "parent_lead", "parent_split", "cut", "depth"))
+# The index of a tree's list of nodes used by Tree.search. names maps each case folded name to the position
+# of the first node with it and the node. key is what the index was built from (see Tree.__name_index_key),
+# nodes is the indexed list, and checked is the newest revision of any tree when the index was last known
+# to be up to date.
+_NameIndex = namedtuple("_NameIndex", ("key", "names", "nodes", "checked"))
+
 
 class Tree:
+    # Trees are often made of many small Tree objects, so their attributes are kept in slots rather than
+    # a dict per instance
+    __slots__ = (
+        "name",
+        "nodes",
+        "fancy",
+        "dirty",
+        "width",
+        "line_wrap",
+        "display_order",
+        "current_node",
+        "_chars",
+        "list",
+        "_string",
+        "_revision",
+        "_wrap_cache",
+        "_cache_key",
+        "_name_index",
+    )
+
     def __init__(
         self,
         name: str = None,
@@ -55,6 +128,10 @@ class Tree:
         self.set_term_size(width)
         self.set_line_wrap(wrap)
         self.display_order = None
+        self._wrap_cache = None
+        self.list = None
+        self._string = None
+        self._cache_key = None
 
 
     def __len__(self):
@@ -80,8 +157,17 @@ class Tree:
 
 
     
+    def _mark_dirty(self):
+        """Flags the tree as changed, so that it will be regenerated the next time it, or any tree
+        containing it, is printed.
+        """
+        global _latest_revision
+        self.dirty = True
+        self._revision = _latest_revision = next(_revisions)
+
     def set_display_order(self, order):
         self.display_order = order
+        self._mark_dirty()
 
     def set_name(self, name: str):
         """Sets the name of the tree object
@@ -90,7 +176,7 @@ class Tree:
             name (str): The new name of the tree
         """
         self.name = name
-        self.dirty = True
+        self._mark_dirty()
 
     def set_nodes(self, nodes: list | dict | None):
         """Sets the nodes of the tree. Overwrites any previous nodes
@@ -98,30 +184,30 @@ class Tree:
         Args:
             nodes (list | dict | None): A list or dict of nodes for the tree
         """
-        if nodes is None:
-            nodes = []
-        if not isinstance(nodes, list) and not isinstance(nodes,dict):
-            nodes = [nodes]
+        if not isinstance(nodes, (list, dict)):
+            nodes = [] if nodes is None else [nodes]
         self.nodes = nodes
-        self.dirty = True
+        self._name_index = None
+        self._mark_dirty()
 
     def add_node(self, node, key=None):
+        self._mark_dirty()
+        self._name_index = None
         if self.nodes is None:
             if key is None:
                 self.nodes = [node]
-                return self.nodes[-1]
             else:
                 self.nodes = {key:node}
-                return self.nodes[key]
+            return node
         elif isinstance(self.nodes,dict):
             if key is not None:
-                self.nodes |= {key:node}
-                return self.nodes[key]
+                self.nodes[key] = node
+                return node
             else:
                 return None
         elif isinstance(self.nodes,list):
             self.nodes.append(node)
-            return self.nodes[-1]
+            return node
         return None
 
 
@@ -133,17 +219,23 @@ class Tree:
         if not len(functions) == len(args):
             return
 
-        if self.nodes is not None:
-            items = self.nodes
-            if isinstance(self.nodes,dict):
-                items = list(self.nodes.values())
+        items = self.nodes
+        if isinstance(items,dict):
+            items = list(items.values())
+        if not isinstance(items,list):
+            return
 
-            if isinstance(items,list):
-                for item in items:
-                    if isinstance(item, Tree):
-                        for i in range(len(functions)):
-                            fun = getattr(item,functions[i])
-                            fun(*(args[i]))
+        # The functions are looked up once for each type of tree, rather than for every child. They are
+        # looked up on the child's type, so that subclasses overriding them still have their own called.
+        methods = {}
+        for item in items:
+            if type(item) is not str and isinstance(item, Tree):
+                item_type = type(item)
+                funs = methods.get(item_type)
+                if funs is None:
+                    funs = methods[item_type] = [getattr(item_type, function) for function in functions]
+                for fun, arg in zip(funs, args):
+                    fun(item, *arg)
 
 
     def search(self,key):
@@ -153,13 +245,79 @@ class Tree:
             except KeyError:
                 return None
 
-        # List search does not work for some reason
+        # Lists are searched by the names of their nodes, ignoring case. The first node with the name is returned.
         if isinstance(self.nodes,list):
-            for item in self.nodes:
-                if str(item.name).lower() == str(key).lower():
-                    return item
+            key = str(key).casefold()
+            index = self._name_index
+            # A hit is checked first, by the node still being where it was with the name. That is enough if no
+            # tree has changed since the index was last checked, as otherwise a node before it could have been
+            # renamed with set_name to match.
+            if index is not None and index.checked == _latest_revision and index.nodes is self.nodes:
+                entry = index.names.get(key)
+                if entry is not None and self.__is_indexed_node(key, entry):
+                    return entry[1]
+            # Otherwise the index is rebuilt if the nodes have changed since it was built. Like the cached
+            # output of print, this is detected through the revisions of the child trees, so a child renamed
+            # with set_name or replaced by a newly made tree is picked up.
+            index_key = self.__name_index_key()
+            if index is None or index.key != index_key:
+                self.__build_name_index(index_key)
+            else:
+                self._name_index = index._replace(checked=_latest_revision)
+            entry = self._name_index.names.get(key)
+            if entry is not None and not self.__is_indexed_node(key, entry):
+                # The node was replaced directly by one made before the index was built
+                self.__build_name_index(index_key)
+                entry = self._name_index.names.get(key)
+            if entry is not None:
+                return entry[1]
         return None
 
+    def __name_index_key(self) -> tuple:
+        """Finds what the name index used by search depends on. Should not be called from outside of the class.
+
+        Returns:
+            tuple: The id and length of the list of nodes, and the highest revision among its trees
+        """
+        latest = 0
+        for item in self.nodes:
+            if type(item) is not str and isinstance(item, Tree) and item._revision > latest:
+                latest = item._revision
+        return (id(self.nodes), len(self.nodes), latest)
+
+    def __build_name_index(self, index_key: tuple):
+        """Builds the index of the list of nodes used by search, mapping each case folded name to the
+        position of the first node with it and the node. Nodes without a name (such as text) are left out.
+        Should not be called from outside of the class.
+
+        Args:
+            index_key (tuple): The key from __name_index_key the index is valid for
+        """
+        names = {}
+        for position, item in enumerate(self.nodes):
+            if hasattr(item, "name"):
+                names.setdefault(str(item.name).casefold(), (position, item))
+        # The list is kept in the index, so that its id can't be reused by another list while it is indexed
+        self._name_index = _NameIndex(key=index_key, names=names, nodes=self.nodes, checked=_latest_revision)
+
+    def __is_indexed_node(self, key: str, entry: tuple) -> bool:
+        """Checks that an entry of the name index still matches the list of nodes. Should not be called
+        from outside of the class.
+
+        Args:
+            key (str): The case folded name the entry was found by
+            entry (tuple): The position of the node and the node
+
+        Returns:
+            bool: True if the node is still at its position and still has the name
+        """
+        position, item = entry
+        return (
+            position < len(self.nodes)
+            and self.nodes[position] is item
+            and str(item.name).casefold() == key
+        )
+
 
     def set_fancy(self, set_fancy: bool, cascade=False):
         """Sets the fancy variable for this tree (whether non 7-bit ASCII characters will be used when printing)
@@ -167,8 +325,11 @@ class Tree:
         Args:
             set_fancy (bool): Whether to use fancy characters or not
         """
-        self.fancy = set_fancy
-        self.__set_characters()
+        # Nothing changes when the tree already uses the characters, so it isn't marked as changed
+        if getattr(self, "_chars", None) is None or self.fancy != set_fancy:
+            self.fancy = set_fancy
+            self.__set_characters()
+            self._mark_dirty()
         if cascade:
             self.__cascade("set_fancy",(set_fancy,cascade))
 
@@ -177,19 +338,45 @@ class Tree:
         """Sets the characters to be used by the tree when printing. Should not be called
         from outside of the class. Only needed when self.fancy is changed.
         """
-        if self.fancy:
-            self.pipe = "│"
-            self.branch = "├─"
-            self.end = "└─"
-            self.space = " "
-            self.nameless = "┐"
-        else:
-            self.pipe = "|"
-            self.branch = "|->"
-            self.end = "|->"
-            self.space = "  "
-            self.nameless = "\\"
-        self.split_line = "~"
+        self._chars = _FANCY if self.fancy else _ASCII
+
+    @property
+    def string(self) -> str | None:
+        """str | None: The tree as a single string, as of the last time it was printed. None if it hasn't been"""
+        if self._string is None and self.list is not None:
+            # Converts the list to a single string
+            self._string = "\n".join(self.list) + "\n" if self.list else ""
+        return self._string
+
+    @property
+    def pipe(self) -> str:
+        """str: The character continuing a branch past the current line"""
+        return self._chars.pipe
+
+    @property
+    def branch(self) -> str:
+        """str: The branch character in front of a node"""
+        return self._chars.branch
+
+    @property
+    def end(self) -> str:
+        """str: The branch character in front of the last node of a tree"""
+        return self._chars.end
+
+    @property
+    def space(self) -> str:
+        """str: The spacing used in place of a pipe once a branch has ended"""
+        return self._chars.space
+
+    @property
+    def nameless(self) -> str:
+        """str: Printed in place of the name of a tree without one"""
+        return self._chars.nameless
+
+    @property
+    def split_line(self) -> str:
+        """str: The character marking a line as a continuation of the line above it"""
+        return self._chars.split_line
 
     def set_term_size(self, width=80, cascade=False):
         """Sets the max width of the tree when printed
@@ -199,6 +386,7 @@ class Tree:
         """
         if width is not None:
             self.width = width
+            self._mark_dirty()
         if cascade:
             self.__cascade("set_term_size",(width,cascade))
 
@@ -210,6 +398,7 @@ class Tree:
         """
         if line_width is not None:
             self.line_wrap = line_width
+            self._mark_dirty()
         if cascade:
             self.__cascade("set_line_wrap",(line_width,cascade))
 
@@ -256,180 +445,371 @@ class Tree:
             (str|list): A string or a list. The list will contain the lines to be printed. There will not be
             a newline character at the end of each string. The string will contain newline characters indicating the
             end of each line. This is toggled with the `as_a_string` parameter.
+
+        The output is cached, and is only regenerated if this tree or one below it has been changed through
+        one of the set_x or add_node functions, or had nodes added or removed directly, since it was last
+        printed. Replacing a node directly with another, or changing the data of a Node, is not detected;
+        call Node.invalidate_str on a changed Node, or set `dirty` to True on this tree to force regeneration.
+
+        Raises:
+            RecursionError: If the tree contains itself
         """
-        # if self.dirty: # Doesn't regenerate tree if no changes have been made.
-        # Sets entire tree as the single child node of tree. Necessary for proper spacing
-        # Saves values so they can be restored after building tree
-        name = self.name
-        nodes = self.nodes
-        display_order = self.display_order
-        child = Tree(
-            name, nodes, fancy=self.fancy, wrap=self.line_wrap, width=self.width
-        )
-        child.set_display_order(self.display_order)
-        self.display_order = None
-        self.name = None
-        self.nodes = [child]
-        # Gets the tree, as a list of lines
-        self.list = self.__recursive_generation(last=True, root=True)
-        # Converts the list to a single string
-        self.string = ""
-        for i in range(len(self.list)):
-            if isinstance(self.list[i], str):
-                if remove_root_branch:
-                    self.list[i] = self.list[i][len(self.end) :]
-                self.string += f"{self.list[i]}\n"
+        # Doesn't regenerate tree if no changes have been made.
+        latest, shape, containers = self.__output_key()
+        cache_key = (latest, shape, remove_root_branch)
+        if self.dirty or self._cache_key is None or self._cache_key[0] != cache_key:
+            if not self.nodes and self.line_wrap <= 0 and type(self).__str__ is Tree.__str__:
+                # A tree without children or wrapping is just its name, so none of the setup is needed
+                name = Tree.__str__(self) or self._chars.nameless
+                self.list = [name if remove_root_branch else self._chars.end + name]
             else:
-                del self.list[i]
-        # Restores the original values of the name and nodes.
-        self.name = name
-        self.nodes = nodes
-        self.display_order = display_order
-        self.dirty = False
-        return self.string if as_a_string else self.list
+                # Wrapped text is cached for the duration of this print, as labels are often repeated
+                self._wrap_cache = {}
+                # Gets the tree, as a list of lines
+                self.list = self.__generate_lines(remove_root_branch)
+                self._wrap_cache = None
+            # The string is only built once it is asked for
+            self._string = None
+            # The nodes are kept alongside, so that their ids can't be reused by others while they are cached
+            self._cache_key = (cache_key, containers)
+            self.dirty = False
+
+        if not as_a_string:
+            return list(self.list)  # A copy, so that changes to it don't affect the cached lines
+        return self.string
+
+    def __output_key(self) -> tuple:
+        """Finds what the printed output of the tree depends on, other than the text of its nodes. Trees
+        shared by more than one parent are only looked at once. Should not be called from outside of the
+        class.
 
-    def __recursive_generation(self, last=False, prior_prefix=0, root=False):
-        """Generates the lines of the tree for printing. This function is recursive and generates
-        child trees as they are encountered. Should not be called from outside of the class. See Tree.print().
+        Returns:
+            tuple: The highest revision number in the tree, the ids and the lengths of the nodes of each
+            tree in it, and a list of those nodes
+        """
+        latest = self._revision
+        containers = []
+        walked = {id(self)}  # Also stops the walk on a tree that contains itself, which printing reports
+        stack = [self]
+        while stack:
+            nodes = stack.pop().nodes
+            if isinstance(nodes, dict):
+                containers.append(nodes)
+                nodes = nodes.values()
+            elif isinstance(nodes, list):
+                containers.append(nodes)
+            else:  # No nodes to print
+                continue
+            for item in nodes:
+                if type(item) is not str and isinstance(item, Tree):  # Text nodes are the most common
+                    if item._revision > latest:
+                        latest = item._revision
+                    if id(item) not in walked:
+                        walked.add(id(item))
+                        stack.append(item)
+        return latest, (tuple(map(id, containers)), tuple(map(len, containers))), containers
+
+    def __wrap(self, text: str, wrap: int) -> tuple:
+        """Splits text into lines no longer than wrap, leaving out blank lines. Results are memoized in
+        self._wrap_cache while the tree is being printed, so identical labels are only wrapped once. Should
+        not be called from outside of the class.
 
         Args:
-            last (bool, optional): Indicates whether this Tree object is the last of its parent's nodes. Defaults to False.
-            prior_prefix (int, optional): The length of the prefix before each node (Number of spaces or pipe characters from upstream branches). Defaults to 0.
+            text (str): The text to split
+            wrap (int): The max length of each line
+
+        Returns:
+            tuple: The first line, or None if it is blank, and a tuple of the rest of the lines that are not blank.
+        """
+        key = (text, wrap)
+        cached = self._wrap_cache.get(key)
+        if cached is None:
+            head, *tail = tabulate(text, wrap, 0).split("\n")
+            cached = (
+                head if head.strip() != "" else None,
+                tuple(text for text in tail if text.strip() != ""),
+            )
+            self._wrap_cache[key] = cached
+        return cached
+
+    def __generate_lines(self, remove_root_branch=True):
+        """Generates the lines of the tree for printing. The tree is walked depth first with an explicit
+        stack instead of recursion, so there is no limit on the depth of the tree and no function call per
+        child tree. Should not be called from outside of the class. See Tree.print().
+
+        The prefixes for the lines of each tree are built once when the tree is first visited, and shared
+        between all of its lines, so each line only takes a single concatenation.
+
+        Args:
+            remove_root_branch (bool, optional): Leaves the root branch character off of the lines if set to True. Defaults to True.
+
+        Raises:
+            RecursionError: If the tree contains itself
 
         Returns:
             list: a list of lines representing the tree.
         """
-        string = []
-        # if str(self) != "":
-        name = str(self)
-        if (
-            name or not root
-        ):  # If the name exists or (it doesn't and this isn't the root node)
-            if not name:  # Name is empty string
-                name = self.nameless
-            prefix = (
-                self.end if last else self.branch
-            )  # Determine if this is the last child of its parent, and sets branch character accordingly
+        lines = []
+        # The tree is laid out as the last (and only) child of an unnamed parent, which is what gives
+        # the spacing of its lines. The root branch is the length of that parent's end character, and
+        # every prefix at the root level is at least that long, so it can be removed from the prefixes.
+        chars = self._chars
+        space, end, split_line = chars.space, chars.end, chars.split_line
+        cut = chars.end_len if remove_root_branch else 0
+
+        # The parent was the tree itself with its name removed. For subclasses that are cast to a string by
+        # more than their name (such as a Node with data), that string is on the line above the root's name.
+        if type(self).__str__ is not Tree.__str__:
+            name = self.name
+            self.name = None
             try:
-                if (
-                    self.line_wrap > 0
-                ):  # If their is a max text width set, split into multiple lines
-                    # Splits the text into a number of lines with max lengths of self.line_wrap
-                    temp = tabulate(name, self.line_wrap, 0)
-                    temp = temp.split(
-                        "\n"
-                    )  # Converts string of lines into a list of lines
-                    for j in range(len(temp)):  # Loops through each line in the text
-                        if (
-                            temp[j].strip() != ""
-                        ):  # Ensures that this is not a blank line
-                            if j == 0:
-                                string.append(
-                                    f"{prefix}{temp[j]}"
-                                )  # Adds branch character
-                            else:  # Or character indicating that this is continuing from the previous line.
-                                string.append(f"{self.split_line}{temp[j]}")
-                else:  # No line-wrapping, so just add branch character and text
-                    string.append(f"{prefix}{name}")
-            except AttributeError:
-                string.append(f"{prefix}{name}")
-        if self.nodes is not None:  # This object has some children nodes
-            keys = []
-            if isinstance(self.nodes,list):
-                if self.display_order:
-                    keys = self.display_order
+                parent_name = str(self)
+            finally:
+                self.name = name
+            if parent_name:
+                if self.line_wrap > 0:
+                    head, tail = self.__wrap(parent_name, self.line_wrap)
+                    if head is not None:
+                        lines.append((end + head)[cut:])
+                    lines.extend([(split_line + text)[cut:] for text in tail])
                 else:
-                    keys = [x for x in range(len(self.nodes))]
-            elif isinstance(self.nodes,dict):
-                if self.display_order:
-                    keys = self.display_order
+                    lines.append(end[cut:] + parent_name)
+
+        # The root is labelled by its name, even if a subclass changes how it is cast to a string.
+        name = Tree.__str__(self)
+        if not name:  # Name is empty string
+            name = chars.nameless
+        # A name of only whitespace can wrap to no lines at all. The first line below such a tree is then
+        # left without the prefix its parent gives the tree's lines (see __settle_blank_name). pending is
+        # set while that line is still to come.
+        pending = None
+        split_at = -1  # Index of the last line prefixed with a first_split
+        if (
+            self.line_wrap > 0
+        ):  # If their is a max text width set, split into multiple lines
+            head, tail = self.__wrap(name, self.line_wrap)
+            if head is not None:
+                lines.append((end + head)[cut:])  # Adds branch character
+            elif tail:  # The first line was blank, so the name starts on the line after the branch
+                lines.append((split_line + tail[0])[cut:])
+                tail = tail[1:]
+            else:  # The root's parent is the unnamed one it is laid out under, which adds no prefix
+                pending = _Pending(index=len(lines), parent_lead="", parent_split=split_line, cut=cut, depth=1)
+            # Then the character indicating that this is continuing from the previous line.
+            lines.extend([(space + split_line + text)[cut:] for text in tail])
+        else:  # No line-wrapping, so just add branch character and text
+            lines.append(end[cut:] + name)
+
+        # Each frame on the stack is a tree whose children are still being generated (see __frame_state).
+        # It holds the iterator over the tree's nodes, so generation can resume after a child tree, and the
+        # prefixes for its lines.
+        if not self.nodes:
+            return lines
+        # Bound once, as they are used for every child in the loop below
+        append, extend, wrap_text, frame_state = lines.append, lines.extend, self.__wrap, self.__frame_state
+        stack = [frame_state(self, True, (space + space)[cut:], (space + split_line)[cut:], chars.end_len)]
+        # The ids of the trees on the stack, in the same order. A tree that is already on it contains itself,
+        # and could never be printed.
+        path = {id(self): None}
+        while stack:
+            # Unpacked in the order of the fields of _FrameState, which the names match
+            (
+                children,
+                last_idx,
+                tree_chars,
+                end_wrap,
+                branch_wrap,
+                child_prior_prefix,
+                lead,
+                first_split,
+                branch_prefix,
+                end_prefix,
+                pipe_split,
+                space_split,
+            ) = stack[-1]
+
+            for i, item in children:  # Loops through each node
+
+                # Boolean as to whether this is the last child of this node
+                is_last_child = i == last_idx
+
+                # Child node is not another Tree object. Strings are the most common nodes, and checking
+                # their type first is quicker than isinstance.
+                is_text = type(item) is str
+                if is_text or not isinstance(item, Tree):
+                    if not is_text:  # Anything else is printed as its string, which strings don't need
+                        if item is None:
+                            continue
+                        item = str(item)
+                    # If the node is just text, decide if this is the last child of its parent's tree
+                    # Change the branch character if it is, otherwise use standard branch character.
+                    prefix = end_prefix if is_last_child else branch_prefix
+                    if end_wrap is None:  # No wrap or width is set, so the text always fits on one line
+                        append(prefix + item)
+                        continue
+                    # Does the same process as with the name, splitting the text across several lines if needed.
+                    # The max length of each line that will be printed here.
+                    head, tail = wrap_text(item, end_wrap if is_last_child else branch_wrap)
+                    # Typically will use a pipe to extend the node if needed, but if
+                    # it is the last node, will only use a space. Regardless, it also uses the
+                    # typical split line character.
+                    # Ex normal node:         Ex last node:
+                    # -> This is a test       -> This is a test
+                    # |~ of the line           ~ of the line
+                    # |~ wrapping function.    ~ wrapping function.
+                    split_prefix = space_split if is_last_child else pipe_split
+                    if head is not None:
+                        append(prefix + head)
+                    extend([split_prefix + text for text in tail])
+                    continue
+
+                # Otherwise the child node is another Tree object, so add its name, then descend into it.
+                chars = item._chars
+                name = str(item)
+                if not name:  # Name is empty string
+                    name = chars.nameless
+                # Determine if this is the last child of its parent, and sets branch character accordingly.
+                # child_split prefixes the wrapped lines of the name, and is the child's first_split.
+                if chars is tree_chars:  # Same characters as this tree, so its prefixes can be reused
+                    prefix = end_prefix if is_last_child else branch_prefix
+                    child_split = space_split if is_last_child else pipe_split
                 else:
-                    keys = list(self.nodes.keys())
-            for i in range(len(keys)):  # Loops through each node
-                key = keys[i]
-                item = self.nodes[key]
-
-                # If the child node is another Tree object, generate that object.
-                if isinstance(item, Tree):
-
-                    # Boolean as to whether this is the last child of this node
-                    child_last = (i == len(self.nodes) - 1 )  
-
-                    # Determines if this is the last child node of its parent,
-                    # and sets branch character accordingly
-                    prefix = (self.end if last else self.branch)
-
-                    # Generate the child node, indicating whether it is the last node.
-                    child = item.__recursive_generation(
-                        child_last, len(prefix) + prior_prefix
+                    prefix = lead + (chars.end if is_last_child else chars.branch)
+                    child_split = lead + (tree_chars.space if is_last_child else tree_chars.pipe) + chars.split_line
+                if item.line_wrap > 0:
+                    head, tail = wrap_text(name, item.line_wrap)
+                    if head is not None:
+                        append(prefix + head)
+                    elif tail:  # The first line was blank, so the name starts on the line after the branch
+                        split_at = len(lines)
+                        append(first_split + tail[0])
+                        tail = tail[1:]
+                    elif item.nodes:  # The name wrapped to nothing
+                        if pending is not None and len(lines) > pending.index:
+                            lines[pending.index] = self.__settle_blank_name(
+                                lines[pending.index], pending, lead, first_split, pending.index == split_at
+                            )
+                            pending = None
+                        if pending is None:  # Otherwise this tree is the first line of another such tree
+                            pending = _Pending(
+                                index=len(lines),
+                                parent_lead=lead,
+                                parent_split=first_split,
+                                cut=0,
+                                depth=len(stack) + 1,
+                            )
+                    extend([child_split + text for text in tail])
+                else:
+                    append(prefix + name)
+
+                if not item.nodes:  # Trees without children don't need a frame of their own
+                    continue
+                if id(item) in path:
+                    raise RecursionError(f"The tree {item.name!r} contains itself")
+                path[id(item)] = None
+                # The lead of the child's children continues this tree's branch, unless the child is the last
+                child_lead = lead + (tree_chars.space if is_last_child else tree_chars.pipe) + tree_chars.space
+                stack.append(frame_state(item, is_last_child, child_lead, child_split, child_prior_prefix))
+                break
+            else:  # All of the tree's children have been generated
+                stack.pop()
+                path.popitem()
+            if pending is not None:
+                if len(lines) > pending.index:  # This tree added the first line below the unprinted name
+                    lines[pending.index] = self.__settle_blank_name(
+                        lines[pending.index], pending, lead, first_split, pending.index == split_at
                     )
+                    pending = None
+                elif len(stack) < pending.depth:  # The tree without a printed name didn't add any lines
+                    pending = None
+        return lines
+
+    @staticmethod
+    def __frame_state(tree, last: bool, lead: str, first_split: str, prior_prefix: int) -> _FrameState:
+        """Builds the frame of a tree for the stack of Tree.__generate_lines, before its children are
+        generated. Should not be called from outside of the class.
 
-                    # Loops through all lines returned from child node
-                    for j in range(1, len(child)):  
-                        line = child[j]
+        Args:
+            tree (Tree): The tree whose children the frame generates
+            last (bool): Whether the tree is the last child of its parent
+            lead (str): The pipe and space characters from upstream branches, which every line of the
+                tree's children is prefixed with
+            first_split (str): The same as lead, but without the space after the last pipe and followed by
+                the split_line character. It prefixes the name of a child when the wrapped name starts on
+                its second line.
+            prior_prefix (int): The length of the branch characters in front of the tree's name
 
-                        # Set prefix according to whether this is the last child node or not
-                        if i != len(self.nodes) - 1:
-                            child[j] = self.pipe
-                        else:
-                            child[j] = self.space
-                        if len(line) > 0 and line[0] != self.split_line:
-                            child[j] += self.space
+        Returns:
+            _FrameState: The frame
+        """
+        # The children are gathered into a single sequence in the order they are printed, so the loop over
+        # them doesn't need to know whether the nodes are a list or a dict.
+        nodes = tree.nodes
+        if not isinstance(nodes, (list, dict)):
+            children = ()
+        elif tree.display_order:
+            children = [nodes[key] for key in tree.display_order]
+        elif isinstance(nodes, dict):
+            children = list(nodes.values())
+        else:
+            children = nodes
+        chars = tree._chars
+        # The max width of the text nodes, which depends on whether they follow an end or branch. Both are
+        # None when the tree has neither a wrap nor width set.
+        line_wrap, width = tree.line_wrap, tree.width
+        if width is not None and width > 0:
+            # Equal to the max width minus the length of the current prefix and the length of all of the
+            # prior prefixes
+            available = width - prior_prefix
+            end_wrap, branch_wrap = available - chars.end_len, available - chars.branch_len
+        elif line_wrap is not None and line_wrap > 0:
+            end_wrap = branch_wrap = line_wrap
+        else:
+            end_wrap = branch_wrap = None
+        return _FrameState(
+            children=enumerate(children),
+            last_idx=len(nodes) - 1 if nodes is not None else -1,
+            tree_chars=chars,
+            end_wrap=end_wrap,
+            branch_wrap=branch_wrap,
+            # Length of this level's branch character, passed down to child trees
+            child_prior_prefix=(chars.end_len if last else chars.branch_len) + prior_prefix,
+            lead=lead,
+            first_split=first_split,
+            # Branch characters of text nodes
+            branch_prefix=lead + chars.branch,
+            end_prefix=lead + chars.end,
+            # Prefixes of the wrapped lines of text nodes, and of the names of child trees
+            pipe_split=lead + chars.pipe + chars.split_line,
+            space_split=lead + chars.space + chars.split_line,
+        )
 
-                        # Add the lines from the inner tree back to the prefixes.
-                        child[j] += line
+    @staticmethod
+    def __settle_blank_name(line: str, pending: _Pending, lead: str, first_split: str, is_split: bool) -> str:
+        """Reprefixes the first line below a tree whose name wrapped to no lines. The parent of a tree
+        prefixes all of the tree's lines but the first, which is normally its name, so the line is left
+        without it. If the parent's name was also not printed, neither is the grandparent's prefix, and
+        so on. Should not be called from outside of the class.
 
-                    # Add the lines of the child to the lines of this tree
-                    string += child  
+        Args:
+            line (str): The line as it was generated
+            pending (_Pending): The index of the line, and the prefixes of the parent of the outermost tree
+                without a printed name: its lead, its first_split, the number of characters to cut from the
+                start of the line, and the length of the stack with the outermost tree's frame on it.
+            lead (str): The lead of the tree that generated the line
+            first_split (str): The first_split of the tree that generated the line
+            is_split (bool): Whether the line starts with first_split rather than lead
 
-                # Child node is not another Tree object
-                else:
-                    if item is not None:
-                        item = str(item)
-                        # If the node is just text, decide if this is the last child of its parent's tree
-                        # Change the branch character if it is, otherwise use standard branch character.
-                        prefix = self.end if (i == len(self.nodes) - 1) else self.branch
-                        # Does the same process as with the name, determining if the text needs to be
-                        # split across several lines, and doing so if needed.
-                        try:
-                            wrap = None  # The max length of each line that will be printed here.
-                            if self.line_wrap is not None and self.line_wrap > 0:
-                                wrap = self.line_wrap
-                            if self.width is not None and self.width > 0:
-                                # Determines the max width that the text can be. It is equal to the max width minus
-                                # the length of the current prefix and the length of all of the prior prefixes
-                                wrap = self.width - len(prefix) - prior_prefix
-                            if wrap is not None:
-                                temp = tabulate(item, wrap, 0)
-                                temp = temp.split("\n")
-                                for j in range(len(temp)):
-                                    if temp[j].strip() != "":
-                                        if j == 0:
-                                            string.append(f"{prefix}{temp[j]}")
-                                        else:
-                                            # Determines which character to use for indicating that this is wrapping.
-                                            # Typically will use a pipe to extend the node if needed, but if
-                                            # it is the last node, will only use a space. Regardless, it also uses the
-                                            # typical split line character.
-                                            # Ex normal node:         Ex last node:
-                                            # -> This is a test       -> This is a test
-                                            # |~ of the line           ~ of the line
-                                            # |~ wrapping function.    ~ wrapping function.
-                                            if i == len(self.nodes) - 1:
-                                                wrap_prefix = self.space
-                                            else:
-                                                wrap_prefix = self.pipe
-                                            string.append(
-                                                f"{wrap_prefix}{self.split_line}{temp[j]}"
-                                            )
-                            else:
-                                string.append(f"{prefix}{item}")
-                        except AttributeError:
-                            string.append(f"{prefix}{item}")
-        return string  # Return the lines of this tree level back to the parent
+        Returns:
+            str: The line with the parent's prefixes
+        """
+        if is_split:
+            return (pending.parent_split + line[len(first_split) :])[pending.cut :]
+        return (pending.parent_lead + line[len(lead) :])[pending.cut :]
 
     def __str__(self):
-        if self.name:
-            return str(self.name)
+        name = self.name
+        if name:
+            return name if type(name) is str else str(name)
         else:
             return ""